@@ -1,7 +1,9 @@
 import streamlit as st
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import numpy as np
 import seaborn as sns
+from scipy.stats import gaussian_kde
 from monte_carlo import monte_carlo_option_price, simulate_price_paths
 from monte_carlo import generate_heatmap_data
 
@@ -9,6 +11,25 @@ from monte_carlo import generate_heatmap_data
 st.set_page_config(page_title="Monte Carlo Option Pricing", layout="wide")
 st.title("Monte Carlo Option Pricing Simulator")
 
+
+# Cached wrappers: the simulations are seeded, so identical inputs can reuse the previous result
+@st.cache_data(show_spinner=False)
+def cached_option_price(S, K, T, r, sigma, num_simulations, option_type, hist_bins):
+    return monte_carlo_option_price(S, K, T, r, sigma, num_simulations, option_type=option_type,
+                                    return_hist_bins=hist_bins)
+
+
+@st.cache_data(show_spinner=False)
+def cached_heatmap_data(S, K, r, sigma, T, option_type, num_simulations):
+    return generate_heatmap_data(S, K, r, sigma, T, option_type=option_type, num_simulations=num_simulations)
+
+
+def show_figure(fig):
+    # Render, then release the figure from pyplot so reruns don't accumulate open figures
+    st.pyplot(fig)
+    plt.close(fig)
+
+
 # Sidebar Inputs
 st.sidebar.header("Input Parameters")
 S = st.sidebar.number_input("Initial Stock Price (S)", value=100.0)
@@ -26,9 +47,9 @@ num_steps = st.sidebar.slider("Number of Time Steps", min_value=10, max_value=50
 # Run simulation button
 if st.button("Run Simulation"):
 
-    # Option pricing
-    call_price, call_ci, ST_call = monte_carlo_option_price(S, K, T, r, sigma, num_simulations, option_type='call')
-    put_price, put_ci, ST_put = monte_carlo_option_price(S, K, T, r, sigma, num_simulations, option_type='put')
+    # Option pricing: call and put share one simulation
+    call_price, call_ci, put_price, put_ci, counts, edges = cached_option_price(S, K, T, r, sigma, num_simulations,
+                                                                               'both', 50)
 
     # Display metrics
     col1, col2 = st.columns(2)
@@ -41,24 +62,24 @@ if st.button("Run Simulation"):
     col3, col4 = st.columns(2)
     with col3:
         fig1, ax1 = plt.subplots()
-        ax1.hist(ST_call, bins=50, alpha=0.7, color='skyblue')
+        ax1.stairs(counts, edges, fill=True, alpha=0.7, color='skyblue')
         ax1.axvline(K, color='red', linestyle='--', label='Strike Price')
         ax1.set_title(f"Simulated Call Final Prices (n={num_simulations})")
         ax1.set_xlabel("Final Asset Price")
         ax1.set_ylabel("Frequency")
         ax1.legend()
-        st.pyplot(fig1)
+        show_figure(fig1)
         st.markdown(f"**95% Confidence Interval (Call):** `${call_ci[0]:.2f} - {call_ci[1]:.2f}`")
 
     with col4:
         fig2, ax2 = plt.subplots()
-        ax2.hist(ST_put, bins=50, alpha=0.7, color='lightcoral')
+        ax2.stairs(counts, edges, fill=True, alpha=0.7, color='lightcoral')
         ax2.axvline(K, color='red', linestyle='--', label='Strike Price')
         ax2.set_title(f"Simulated Put Final Prices (n={num_simulations})")
         ax2.set_xlabel("Final Asset Price")
         ax2.set_ylabel("Frequency")
         ax2.legend()
-        st.pyplot(fig2)
+        show_figure(fig2)
         st.markdown(f"**95% Confidence Interval (Put):** `${put_ci[0]:.2f} - {put_ci[1]:.2f}`")
 
 
@@ -68,18 +89,29 @@ if st.button("Run Simulation"):
     # Plot price paths
     fig3, ax3 = plt.subplots(figsize=(10, 5))
     time_grid = np.linspace(0, T, num_steps + 1)
-    for i in range(num_paths):
-        ax3.plot(time_grid, price_paths[i], lw=1, alpha=0.6)
+    # One LineCollection for all paths instead of a Line2D per path; colors follow the default cycle
+    segments = np.empty((num_paths, num_steps + 1, 2))
+    segments[..., 0] = time_grid
+    segments[..., 1] = price_paths
+    path_colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    ax3.add_collection(LineCollection(segments, colors=path_colors, linewidths=1, alpha=0.6))
+    ax3.autoscale()
     ax3.set_xlabel("Time (Years)")
     ax3.set_ylabel("Stock Price")
     ax3.set_title(f"{num_paths} Simulated Stock Price Paths (Geometric Brownian Motion)")
     ax3.grid(True, linestyle='--', alpha=0.5)
-    st.pyplot(fig3)
+    show_figure(fig3)
 
     # Plot histogram with KDE for final prices
     final_prices = price_paths[:, -1]
     fig4, ax4 = plt.subplots(figsize=(10, 5))
-    sns.histplot(final_prices, bins=50, kde=True, stat="density", color='skyblue', edgecolor='black', ax=ax4)
+    final_density, final_edges = np.histogram(final_prices, bins=50, density=True)
+    ax4.stairs(final_density, final_edges, fill=True, facecolor='skyblue', edgecolor='black')
+    if np.ptp(final_prices) > 0:  # KDE needs more than one distinct final price
+        price_grid = np.linspace(final_edges[0], final_edges[-1], 200)
+        kde_values = gaussian_kde(final_prices)(price_grid)
+        ax4.fill_between(price_grid, kde_values, color='steelblue', alpha=0.2)
+        ax4.plot(price_grid, kde_values, color='steelblue', lw=1.5)
     ax4.axvline(np.mean(final_prices), color='green', linestyle='dotted', linewidth=2, label='Mean')
     ax4.axvline(K, color='red', linestyle='dashed', linewidth=2, label='Strike Price')
     ax4.set_title("Histogram & Density of Final Simulated Stock Prices")
@@ -87,7 +119,7 @@ if st.button("Run Simulation"):
     ax4.set_ylabel("Density")
     ax4.legend()
     ax4.grid(True, linestyle='--', alpha=0.5)
-    st.pyplot(fig4)
+    show_figure(fig4)
 
 
    # --- Option Price Heatmap Section ---
@@ -96,9 +128,9 @@ if st.button("Run Simulation"):
     # --- Generate Heatmaps for Call and Put Together ---
     with st.spinner("Generating heatmaps for Call and Put options..."):
         
-        heatmap_call, sigmas, maturities = generate_heatmap_data(S, K, r, sigma, T, option_type='call', num_simulations=num_simulations)
+        heatmap_call, sigmas, maturities = cached_heatmap_data(S, K, r, sigma, T, 'call', num_simulations)
 
-        heatmap_put, _, _ = generate_heatmap_data(S, K, r, sigma, T, option_type='put', num_simulations=num_simulations)
+        heatmap_put, _, _ = cached_heatmap_data(S, K, r, sigma, T, 'put', num_simulations)
 
 
 
@@ -119,7 +151,7 @@ if st.button("Run Simulation"):
             ax_call.set_xlabel("Volatility (σ)")
             ax_call.set_ylabel("Time to Maturity (T)")
             ax_call.set_title("Call Option Price Heatmap")
-            st.pyplot(fig_call)
+            show_figure(fig_call)
 
         with col_h2:
             fig_put, ax_put = plt.subplots(figsize=(6, 5))
@@ -134,4 +166,4 @@ if st.button("Run Simulation"):
             ax_put.set_xlabel("Volatility (σ)")
             ax_put.set_ylabel("Time to Maturity (T)")
             ax_put.set_title("Put Option Price Heatmap")
-            st.pyplot(fig_put)
+            show_figure(fig_put)
@@ -1,42 +1,271 @@
+import math
+import multiprocessing
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-from scipy.stats import norm
+from numba import njit, prange
+from scipy.special import ndtri
+from scipy.stats import qmc, t as student_t
+
+# Seed for the pricing generators, so repeated runs with the same inputs give the same prices
+SEED = 42
+
+# Number of simulations evaluated at once per heatmap tile (20 x 20 x 8192 float32 ~ 13 MB)
+HEATMAP_BLOCK_SIZE = 8192
 
-def monte_carlo_option_price(S, K, T, r, sigma, num_simulations=10000, option_type='call', confidence_level=0.95):
+def _seed_sequence(seed):
     """
-    Monte Carlo simulation to price a European option with confidence intervals.
-    
+    Wrap an int (or None) seed in a SeedSequence so independent child streams can be spawned from it.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def _sobol_uniforms(n, d, seed=None):
+    """
+    Draw uniforms on (0, 1) from a scrambled Sobol sequence.
+
     Returns:
-        price: Estimated option price (mean)
-        conf_interval: Tuple (lower_bound, upper_bound) of confidence interval
-        ST: Simulated end prices (for plotting)
+        U: numpy array of shape (n, d)
     """
-    np.random.seed(42)
+    sampler = qmc.Sobol(d=d, scramble=True, seed=np.random.default_rng(seed))
+    with warnings.catch_warnings():
+        # Sample sizes come from the UI and are rarely powers of two; a prefix is still a valid sample
+        warnings.simplefilter('ignore', UserWarning)
+        U = sampler.random(n)
 
-    Z = np.random.standard_normal(num_simulations)
-    ST = S * np.exp((r - 0.5 * sigma**2) * T + sigma * np.sqrt(T) * Z)
+    np.clip(U, 1e-12, 1 - 1e-12, out=U)
+    return U
 
-    if option_type == 'call':
-        payoffs = np.maximum(ST - K, 0)
-    elif option_type == 'put':
-        payoffs = np.maximum(K - ST, 0)
-    else:
-        raise ValueError("option_type must be 'call' or 'put'")
 
-    discounted_payoffs = np.exp(-r * T) * payoffs
-    price = discounted_payoffs.mean()
+def _sobol_normals(n, d, seed=None):
+    """
+    Draw standard normals from a scrambled Sobol sequence via the inverse normal CDF.
+
+    Returns:
+        Z: numpy array of shape (n, d)
+    """
+    Z = _sobol_uniforms(n, d, seed)
+    ndtri(Z, out=Z)
+    return Z
+
+
+@njit(fastmath=True, cache=True)
+def _norm_ppf(u):
+    """
+    Inverse standard normal CDF for u in (0, 1) (Acklam's rational approximation, relative error < 1.2e-9).
+
+    Used instead of Box-Muller so each Sobol coordinate still maps monotonically onto one normal draw.
+    """
+    if u < 0.02425:
+        q = math.sqrt(-2.0 * math.log(u))
+        return ((((((-7.784894002430293e-03 * q - 3.223964580411365e-01) * q - 2.400758277161838e+00) * q
+                    - 2.549732539343734e+00) * q + 4.374664141464968e+00) * q + 2.938163982698783e+00)
+                / ((((7.784695709041462e-03 * q + 3.224671290700398e-01) * q + 2.445134137142996e+00) * q
+                    + 3.754408661907416e+00) * q + 1.0))
+    if u > 1.0 - 0.02425:
+        return -_norm_ppf(1.0 - u)
 
-    # Confidence interval calculation
-    std_dev = discounted_payoffs.std(ddof=1)
-    std_err = std_dev / np.sqrt(num_simulations)
+    q = u - 0.5
+    r = q * q
+    return ((((((-3.969683028665376e+01 * r + 2.209460984245205e+02) * r - 2.759285104469687e+02) * r
+               + 1.383577518672690e+02) * r - 3.066479806614716e+01) * r + 2.506628277459239e+00) * q
+            / (((((-5.447609879822406e+01 * r + 1.615858368580409e+02) * r - 1.556989798598866e+02) * r
+                 + 6.680131188771972e+01) * r - 1.328068155288572e+01) * r + 1.0))
 
-    z = norm.ppf(0.5 + confidence_level / 2)  # e.g., 1.96 for 95%
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _gbm_paths(S, drift, vol, Z, out):
+    """
+    Fill out (num_paths, num_steps+1) with GBM paths driven by the shocks Z (num_paths, num_steps).
+
+    Paths are independent, so each thread walks one path and carries the price in a scalar.
+    """
+    num_paths, num_steps = Z.shape
+    for i in prange(num_paths):
+        s = S
+        out[i, 0] = s
+        for t in range(num_steps):
+            s *= np.exp(drift + vol * Z[i, t])
+            out[i, t + 1] = s
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _batch_payoff_moments(S, K, drift, vol, discount, U, is_call, ST_out, hist_out, hist_lo, bins_per_price):
+    """
+    Per-batch moments of antithetic pairs driven by the Sobol uniforms U (num_batches, num_pairs).
+
+    For each pair, Y is the averaged discounted payoff and C the averaged discounted terminal price
+    (the control variate). Each uniform is turned into its normal draw inline, and payoff, discount and
+    the sums are fused into the same pass, so U is read once and no normal buffer is ever stored.
+    The mirrored price uses S*exp(drift - vol*Z) = (S*exp(drift))**2 / S*exp(drift + vol*Z) whenever
+    S*exp(drift + vol*Z) > 0. Everything is computed in float64: with antithetic pairs var(C) is small and beta is large, so even
+    float32 rounding in C would bias beta * (C - S) well beyond the confidence interval.
+
+    If ST_out (num_batches, 2, num_pairs) is non-empty, the terminal prices driven by Z and -Z are
+    written into it for plotting. If hist_out (num_batches, num_bins) is non-empty, each batch instead
+    counts its terminal prices into equal-width bins of 1 / bins_per_price starting at hist_lo; prices
+    outside the bins are dropped.
+
+    is_call is a plain runtime flag: it is loop-invariant, so LLVM hoists the branch out of the inner loop,
+    and a single cached signature serves both calls and puts without any per-call dispatch cost.
+
+    Returns:
+        moments: array (num_batches, 4) of the batch means of Y, C, Y*C and C*C
+    """
+    num_batches, num_pairs = U.shape
+    forward_sq = (S * np.exp(drift))**2
+    half_discount = 0.5 * discount
+    write_st = ST_out.size > 0
+    num_bins = hist_out.shape[1]
+
+    moments = np.empty((num_batches, 4))
+    for b in prange(num_batches):
+        sum_y = 0.0
+        sum_c = 0.0
+        sum_yc = 0.0
+        sum_cc = 0.0
+        for i in range(num_pairs):
+            z = _norm_ppf(U[b, i])
+            st_up = S * np.exp(drift + vol * z)
+            # The division trick needs st_up > 0; S = 0 (or an underflowed exp) falls back to the second exp
+            st_down = forward_sq / st_up if st_up > 0.0 else S * np.exp(drift - vol * z)
+            if write_st:
+                ST_out[b, 0, i] = st_up
+                ST_out[b, 1, i] = st_down
+            if num_bins > 0:
+                for st in (st_up, st_down):
+                    k = math.floor((st - hist_lo) * bins_per_price)
+                    if 0 <= k < num_bins:
+                        hist_out[b, int(k)] += 1
+            if is_call:
+                y = half_discount * (max(st_up - K, 0.0) + max(st_down - K, 0.0))
+            else:
+                y = half_discount * (max(K - st_up, 0.0) + max(K - st_down, 0.0))
+            c = half_discount * (st_up + st_down)
+            sum_y += y
+            sum_c += c
+            sum_yc += y * c
+            sum_cc += c * c
+        moments[b, 0] = sum_y / num_pairs
+        moments[b, 1] = sum_c / num_pairs
+        moments[b, 2] = sum_yc / num_pairs
+        moments[b, 3] = sum_cc / num_pairs
+    return moments
+
+
+def _control_variate_estimate(moments, S, confidence_level):
+    """
+    Control-variate price and confidence interval from the per-batch moments of _batch_payoff_moments.
+
+    Returns:
+        price: Estimated option price (mean)
+        conf_interval: Tuple (lower_bound, upper_bound) of confidence interval
+    """
+    num_batches = len(moments)
+
+    # Control variate: beta = cov(Y, C) / var(C) pooled over all pairs, then shift each batch by beta * (C - S)
+    mean_y, mean_c, mean_yc, mean_cc = moments.mean(axis=0)
+    var_c = mean_cc - mean_c * mean_c
+    beta = (mean_yc - mean_y * mean_c) / var_c if var_c > 0 else 0.0
+    batch_means = moments[:, 0] - beta * (moments[:, 1] - S)
+    price = batch_means.mean()
+
+    # Confidence interval from the independent batch means
+    std_err = batch_means.std(ddof=1) / math.sqrt(num_batches)
+
+    z = student_t.ppf(0.5 + confidence_level / 2, num_batches - 1)  # e.g., 2.09 for 95% with 20 batches
     conf_lower = price - z * std_err
     conf_upper = price + z * std_err
 
-    return price, (conf_lower, conf_upper), ST, 
+    return price, (conf_lower, conf_upper)
+
+
+def monte_carlo_option_price(S, K, T, r, sigma, num_simulations=10000, option_type='call', confidence_level=0.95,
+                             num_batches=20, return_paths=True, seed=SEED, return_hist_bins=None):
+    """
+    Quasi-Monte Carlo simulation to price a European option with confidence intervals.
+
+    The draws come from the num_batches independently scrambled dimensions of one Sobol sequence, each
+    used together with its antithetic mirror (Z, -Z). The discounted terminal price, whose expectation is exactly S, is
+    used as a control variate. Neither Sobol points nor antithetic pairs are independent, so the
+    confidence interval is built from the spread of the batch means instead of the per-sample standard
+    deviation. num_simulations is rounded up to a multiple of 2 * num_batches. The scrambling is drawn
+    from seed (an int or a numpy SeedSequence), so no global random state is touched.
+
+    option_type='both' prices the call and the put from the same draws, deriving the put through
+    put-call parity instead of a second simulation.
+
+    With return_hist_bins set, the terminal prices are binned inside the pricing pass instead of being
+    returned: the bins span the 0.003% to 99.997% lognormal quantiles (+/- 4 standard deviations), and
+    the few prices outside that range are left out of the counts.
+
+    Returns:
+        price: Estimated option price (mean)
+        conf_interval: Tuple (lower_bound, upper_bound) of confidence interval
+        ST: Simulated end prices as float32 (for plotting), or None if return_paths is False
+
+        With option_type='both': (call_price, call_conf_interval, put_price, put_conf_interval, ST)
+        With return_hist_bins: ST is replaced by (counts, edges), as from np.histogram
+    """
+    if option_type not in ('call', 'put', 'both'):
+        raise ValueError("option_type must be 'call', 'put' or 'both'")
+
+    if num_batches < 2:
+        raise ValueError("num_batches must be at least 2 to estimate a confidence interval")
+
+    # One Sobol sampler with a dimension per batch: each dimension is scrambled independently
+    num_pairs = -(-num_simulations // (2 * num_batches))
+    U = np.ascontiguousarray(_sobol_uniforms(num_pairs, num_batches, seed).T)
+
+    # Scalar constants shared by the pricing kernel and the histogram range
+    drift = (r - 0.5 * sigma * sigma) * T
+    vol = sigma * math.sqrt(T)
+    discount = math.exp(-r * T)
+
+    # Terminal prices are only needed for plotting, so single precision is plenty
+    return_paths = return_paths and return_hist_bins is None
+    ST = np.empty((num_batches, 2, num_pairs) if return_paths else (0, 0, 0), dtype=np.float32)
+
+    # Histogram range from the lognormal quantiles of ST, so the kernel can bin without a min/max pass
+    num_bins = return_hist_bins or 0
+    hist_lo = hist_hi = bins_per_price = 0.0
+    if num_bins:
+        if S > 0:
+            log_center = math.log(S) + drift
+            hist_lo = math.exp(log_center - 4 * vol)
+            hist_hi = math.exp(log_center + 4 * vol)
+        if hist_hi <= hist_lo:
+            # sigma = 0, T = 0 or S = 0: every path ends at the same price, so widen the range around it
+            half_width = max(0.01 * hist_hi, 0.01)
+            hist_lo, hist_hi = hist_lo - half_width, hist_hi + half_width
+        bins_per_price = num_bins / (hist_hi - hist_lo)
+    hist = np.zeros((num_batches, num_bins), dtype=np.int64)
 
+    # Antithetic variates: each draw Z prices the pair of paths driven by Z and -Z
+    moments = _batch_payoff_moments(float(S), float(K), drift, vol, discount, U, option_type != 'put', ST, hist,
+                                    hist_lo, bins_per_price)
+    if return_hist_bins:
+        plot_data = (hist.sum(axis=0), np.linspace(hist_lo, hist_hi, num_bins + 1))
+    else:
+        plot_data = (ST.ravel() if return_paths else None,)
+
+    price, conf_interval = _control_variate_estimate(moments, S, confidence_level)
+    if option_type != 'both':
+        return (price, conf_interval) + plot_data
+
+    # Put-call parity per pair: Y_put = Y_call - C + discount * K, so the put needs no second payoff pass
+    put_moments = moments.copy()
+    put_moments[:, 0] = moments[:, 0] - moments[:, 1] + discount * K
+    put_moments[:, 2] = moments[:, 2] - moments[:, 3] + discount * K * moments[:, 1]
+    put_price, put_conf_interval = _control_variate_estimate(put_moments, S, confidence_level)
 
-def simulate_price_paths(S, T, r, sigma, num_steps=100, num_paths=10):
+    return (price, conf_interval, put_price, put_conf_interval) + plot_data
+
+
+def simulate_price_paths(S, T, r, sigma, num_steps=100, num_paths=10, seed=SEED):
     """
     Simulate multiple stock price paths using Geometric Brownian Motion.
     
@@ -47,26 +276,45 @@ def simulate_price_paths(S, T, r, sigma, num_steps=100, num_paths=10):
         sigma: volatility
         num_steps: number of time intervals
         num_paths: number of simulation paths
+        seed: int or numpy SeedSequence, so paths are identical across reruns (None draws fresh entropy)
     
     Returns:
         paths: numpy array of shape (num_paths, num_steps+1)
     """
     dt = T / num_steps
-    paths = np.zeros((num_paths, num_steps + 1))
-    paths[:, 0] = S
 
-    for t in range(1, num_steps + 1):
-        Z = np.random.standard_normal(num_paths)  # random shocks
-        paths[:, t] = paths[:, t-1] * np.exp((r - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z)
-    
+    # Draw every shock up front, then walk the paths in parallel. A handful of paths gains nothing from
+    # low discrepancy, so these use plain pseudo-random normals
+    Z = np.random.default_rng(seed).standard_normal((num_paths, num_steps))  # random shocks
+
+    drift = (r - 0.5 * sigma * sigma) * dt
+    vol = sigma * math.sqrt(dt)
+
+    paths = np.empty((num_paths, num_steps + 1))
+    _gbm_paths(S, drift, vol, Z, paths)
+
     return paths
 
 
-def generate_heatmap_data(S, K, r, base_sigma, base_T, option_type='call', num_simulations=5000):
+def _heatmap_cell_price(params):
+    """
+    Price a single heatmap cell in a worker process. Only scalars and the cell's seed cross the process boundary.
+    """
+    S, K, T, r, sigma, num_simulations, option_type, cell_seed = params
+    price, _, _ = monte_carlo_option_price(S, K, T, r, sigma, num_simulations, option_type=option_type,
+                                           return_paths=False, seed=cell_seed)
+    return price
+
+
+def generate_heatmap_data(S, K, r, base_sigma, base_T, option_type='call', num_simulations=5000,
+                          use_processes=False, max_workers=None, seed=SEED):
     """
     Generate a 2D grid of option prices where volatility and maturity ranges 
     are dynamically adjusted based on user inputs.
 
+    By default every cell is priced from the same draws (common random numbers), so the
+    simulation noise is shared across the grid and the surface stays smooth in (T, sigma).
+
     Parameters:
         S: Initial stock price
         K: Strike price
@@ -75,6 +323,10 @@ def generate_heatmap_data(S, K, r, base_sigma, base_T, option_type='call', num_s
         base_T: The user's selected time to maturity
         option_type: 'call' or 'put'
         num_simulations: Number of Monte Carlo simulations
+        use_processes: Price each cell independently across a process pool instead of the
+            single broadcasted evaluation
+        max_workers: Number of worker processes when use_processes is True (defaults to the CPU count)
+        seed: int or numpy SeedSequence; with use_processes each cell gets its own spawned child seed
     
     Returns:
         heatmap_data: 2D numpy array [maturities x sigmas]
@@ -85,11 +337,48 @@ def generate_heatmap_data(S, K, r, base_sigma, base_T, option_type='call', num_s
     sigmas = np.linspace(max(0.01, base_sigma * 0.5), base_sigma * 1.5, 20)
     maturities = np.linspace(max(0.05, base_T * 0.5), base_T * 2.0, 20)
 
-    heatmap_data = np.zeros((len(maturities), len(sigmas)))
+    if option_type not in ('call', 'put'):
+        raise ValueError("option_type must be 'call' or 'put'")
+
+    if use_processes:
+        cell_seeds = iter(_seed_sequence(seed).spawn(len(maturities) * len(sigmas)))
+        params = [(S, K, T, r, sigma, num_simulations, option_type, next(cell_seeds))
+                  for T in maturities for sigma in sigmas]
+        # Spawn rather than fork: forking after a parallel Numba kernel has run copies a live threading layer
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            prices = list(pool.map(_heatmap_cell_price, params, chunksize=16))
+        return np.array(prices).reshape(len(maturities), len(sigmas)), sigmas, maturities
+
+    # One set of Sobol shocks shared by every (T, sigma) cell, in single precision: without a control
+    # variate the float32 rounding stays far below the simulation noise
+    Z = _sobol_normals(num_simulations, 1, seed)[:, 0].astype(np.float32)
+
+    # Broadcast shapes: maturities down the rows, sigmas across the columns, simulations last
+    T_col = maturities[:, None, None]
+    sig_col = sigmas[None, :, None]
+    drift = ((r - 0.5 * sig_col**2) * T_col).astype(np.float32)
+    vol = (sig_col * np.sqrt(T_col)).astype(np.float32)
+
+    # Tile over simulations so the (maturities x sigmas x block) array stays small; one tile buffer is reused
+    payoff_sum = np.zeros((len(maturities), len(sigmas)))
+    tile = np.empty((len(maturities), len(sigmas), min(num_simulations, HEATMAP_BLOCK_SIZE)), dtype=np.float32)
+    for start in range(0, num_simulations, HEATMAP_BLOCK_SIZE):
+        Z_block = Z[start:start + HEATMAP_BLOCK_SIZE]
+        payoffs = tile[..., :len(Z_block)]
+
+        # payoffs holds ST = S * exp(drift + vol * Z) first, then the payoff on top of it
+        np.multiply(vol, Z_block, out=payoffs)
+        np.add(payoffs, drift, out=payoffs)
+        np.exp(payoffs, out=payoffs)
+        np.multiply(payoffs, S, out=payoffs)
+        if option_type == 'call':
+            np.subtract(payoffs, K, out=payoffs)
+        else:
+            np.subtract(K, payoffs, out=payoffs)
+        np.maximum(payoffs, 0, out=payoffs)
+
+        payoff_sum += payoffs.sum(axis=2, dtype=np.float64)
 
-    for i, T in enumerate(maturities):
-        for j, sigma in enumerate(sigmas):
-            price, _, _ = monte_carlo_option_price(S, K, T, r, sigma, num_simulations, option_type=option_type)
-            heatmap_data[i, j] = price
+    heatmap_data = np.exp(-r * T_col[..., 0]) * payoff_sum / num_simulations
 
     return heatmap_data, sigmas, maturities
@@ -0,0 +1,149 @@
+import math
+import time
+
+import numpy as np
+import pytest
+from scipy.stats import norm
+
+from monte_carlo import HEATMAP_BLOCK_SIZE, generate_heatmap_data, monte_carlo_option_price, simulate_price_paths
+
+# Slack for cells where almost no path crosses the strike: the CI collapses but the true value isn't quite 0
+ABS_TOL = 1e-4
+
+
+def black_scholes(S, K, T, r, sigma, option_type):
+    d1 = (math.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * math.sqrt(T))
+    d2 = d1 - sigma * math.sqrt(T)
+    if option_type == 'call':
+        return S * norm.cdf(d1) - K * math.exp(-r * T) * norm.cdf(d2)
+    return K * math.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
+
+
+@pytest.mark.parametrize('option_type', ['call', 'put'])
+@pytest.mark.parametrize('sigma', [0.01, 0.05, 0.2, 0.6])
+@pytest.mark.parametrize('T', [0.1, 1.0, 3.0])
+@pytest.mark.parametrize('K', [80.0, 100.0, 120.0])
+def test_confidence_interval_covers_black_scholes(K, T, sigma, option_type):
+    S, r = 100.0, 0.05
+    _, (lower, upper), _ = monte_carlo_option_price(S, K, T, r, sigma, 20000, option_type=option_type,
+                                                    return_paths=False)
+    expected = black_scholes(S, K, T, r, sigma, option_type)
+    assert lower - ABS_TOL <= expected <= upper + ABS_TOL
+
+
+@pytest.mark.parametrize('S, K, T, r, sigma', [(100.0, 100.0, 0.05, 0.01, 0.01), (50.0, 50.0, 0.1, 0.02, 0.05)])
+def test_low_volatility_has_no_control_variate_bias(S, K, T, r, sigma):
+    _, (lower, upper), _ = monte_carlo_option_price(S, K, T, r, sigma, 100000, return_paths=False)
+    assert lower <= black_scholes(S, K, T, r, sigma, 'call') <= upper
+
+
+@pytest.mark.parametrize('T, sigma', [(1.0, 0.0), (0.0, 0.2)])
+@pytest.mark.parametrize('return_hist_bins', [None, 20])
+def test_deterministic_inputs_return_discounted_intrinsic_value(T, sigma, return_hist_bins):
+    S, K, r = 100.0, 95.0, 0.05
+    result = monte_carlo_option_price(S, K, T, r, sigma, 1000, option_type='both', return_hist_bins=return_hist_bins)
+    call_price, call_ci, put_price, put_ci = result[:4]
+
+    assert call_price == pytest.approx(max(S - K * math.exp(-r * T), 0.0))
+    assert put_price == pytest.approx(max(K * math.exp(-r * T) - S, 0.0), abs=1e-9)
+    assert call_ci[0] <= call_price <= call_ci[1]
+    if return_hist_bins:
+        counts, edges = result[4:]
+        assert counts.sum() == 1000
+        assert len(edges) == return_hist_bins + 1
+
+
+@pytest.mark.parametrize('option_type', ['call', 'put', 'both'])
+@pytest.mark.parametrize('return_hist_bins', [None, 20])
+def test_zero_spot_prices_call_at_zero_and_put_at_discounted_strike(option_type, return_hist_bins):
+    K, T, r, sigma = 100.0, 1.0, 0.05, 0.2
+    result = monte_carlo_option_price(0.0, K, T, r, sigma, 1000, option_type=option_type,
+                                      return_hist_bins=return_hist_bins)
+    expected = {'call': 0.0, 'put': K * math.exp(-r * T)}
+
+    priced = ['call', 'put'] if option_type == 'both' else [option_type]
+    for i, name in enumerate(priced):
+        price, (lower, upper) = result[2 * i], result[2 * i + 1]
+        assert price == pytest.approx(expected[name], abs=1e-9)
+        assert lower == pytest.approx(price, abs=1e-9) and upper == pytest.approx(price, abs=1e-9)
+    if return_hist_bins:
+        assert result[-2].sum() == 1000
+
+
+@pytest.mark.parametrize('option_type', ['call', 'put', 'both'])
+def test_in_kernel_histogram_matches_numpy(option_type):
+    ST = monte_carlo_option_price(100.0, 100.0, 1.0, 0.05, 0.2, 10000, option_type=option_type)[-1]
+    counts, edges = monte_carlo_option_price(100.0, 100.0, 1.0, 0.05, 0.2, 10000, option_type=option_type,
+                                             return_hist_bins=50)[-2:]
+
+    assert len(edges) == 51
+    np.testing.assert_array_equal(counts, np.histogram(ST, bins=edges)[0])
+
+
+@pytest.mark.parametrize('K', [80.0, 100.0, 120.0])
+def test_both_satisfies_put_call_parity(K):
+    S, T, r, sigma = 100.0, 1.0, 0.05, 0.2
+    call_price, call_ci, put_price, put_ci, ST = monte_carlo_option_price(S, K, T, r, sigma, 10000, option_type='both')
+
+    assert call_price - put_price == pytest.approx(S - K * math.exp(-r * T), abs=1e-9)
+    assert call_ci[1] - call_ci[0] == pytest.approx(put_ci[1] - put_ci[0], rel=1e-6)
+
+    single_call, _, single_ST = monte_carlo_option_price(S, K, T, r, sigma, 10000, option_type='call')
+    single_put, _, _ = monte_carlo_option_price(S, K, T, r, sigma, 10000, option_type='put')
+    assert call_price == pytest.approx(single_call)
+    assert put_price == pytest.approx(single_put, abs=1e-9)
+    np.testing.assert_array_equal(ST, single_ST)
+
+
+@pytest.mark.parametrize('num_batches', [0, 1])
+def test_rejects_too_few_batches_for_a_confidence_interval(num_batches):
+    with pytest.raises(ValueError, match='num_batches'):
+        monte_carlo_option_price(100.0, 100.0, 1.0, 0.05, 0.2, 1000, num_batches=num_batches)
+
+
+def test_price_paths_are_reproducible_by_default():
+    paths = simulate_price_paths(100.0, 1.0, 0.05, 0.2, num_steps=50, num_paths=10)
+
+    assert paths.shape == (10, 51)
+    np.testing.assert_array_equal(paths[:, 0], 100.0)
+    np.testing.assert_array_equal(paths, simulate_price_paths(100.0, 1.0, 0.05, 0.2, num_steps=50, num_paths=10))
+
+
+@pytest.mark.parametrize('option_type', ['call', 'put', 'both'])
+def test_warm_call_skips_numba_recompilation(option_type):
+    # A warm call must hit the already compiled kernel; a dispatch that re-enters the compiler costs tens of ms
+    monte_carlo_option_price(100.0, 100.0, 1.0, 0.05, 0.2, 10000, option_type=option_type)
+
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        monte_carlo_option_price(100.0, 100.0, 1.0, 0.05, 0.2, 10000, option_type=option_type)
+        timings.append(time.perf_counter() - start)
+
+    assert sorted(timings)[len(timings) // 2] < 0.015
+
+
+def black_scholes_grid(S, K, r, sigmas, maturities, option_type):
+    return np.array([[black_scholes(S, K, T, r, sigma, option_type) for sigma in sigmas] for T in maturities])
+
+
+@pytest.mark.parametrize('option_type', ['call', 'put'])
+def test_heatmap_matches_black_scholes(option_type):
+    # A partial last tile exercises the reused float32 buffer on a shorter block
+    num_simulations = 10000
+    assert num_simulations % HEATMAP_BLOCK_SIZE
+
+    heatmap, sigmas, maturities = generate_heatmap_data(100.0, 100.0, 0.05, 0.2, 1.0, option_type, num_simulations)
+
+    assert heatmap.shape == (len(maturities), len(sigmas))
+    np.testing.assert_allclose(heatmap, black_scholes_grid(100.0, 100.0, 0.05, sigmas, maturities, option_type),
+                               rtol=2e-3)
+
+
+def test_heatmap_process_pool_matches_black_scholes():
+    heatmap, sigmas, maturities = generate_heatmap_data(100.0, 100.0, 0.05, 0.2, 1.0, 'put', 2000,
+                                                        use_processes=True, max_workers=2)
+
+    assert heatmap.shape == (len(maturities), len(sigmas))
+    np.testing.assert_allclose(heatmap, black_scholes_grid(100.0, 100.0, 0.05, sigmas, maturities, 'put'),
+                               rtol=0.05)